@@ -14,22 +14,26 @@ class FilterHistoryMessageByModelFeaturesMixin:
         :param model
         :return:
         """
+        features = (model.entity.features if model.entity else None) or []
+        allowed_types = {PromptMessageContentType.TEXT}
+        if ModelFeature.VISION in features:
+            allowed_types |= {
+                PromptMessageContentType.IMAGE, PromptMessageContentType.VIDEO, PromptMessageContentType.DOCUMENT,
+            }
+        if ModelFeature.AUDIO in features:
+            allowed_types.add(PromptMessageContentType.AUDIO)
+        if ModelFeature.VIDEO in features:
+            allowed_types.add(PromptMessageContentType.VIDEO)
+        if ModelFeature.DOCUMENT in features:
+            allowed_types.add(PromptMessageContentType.DOCUMENT)
+        allowed_types = frozenset(allowed_types)
         for msg in model.history_prompt_messages:
             if isinstance(msg.content, list):
-                filtered_content = [
-                    item
-                    for item in msg.content
-                    if (
-                            item.type == PromptMessageContentType.TEXT
-                            or (item.type in {
-                        PromptMessageContentType.IMAGE, PromptMessageContentType.VIDEO,
-                        PromptMessageContentType.DOCUMENT,
-                    } and ModelFeature.VISION in model.entity.features)
-                            or (item.type == PromptMessageContentType.AUDIO and ModelFeature.AUDIO in model.entity.features)
-                            or (item.type == PromptMessageContentType.VIDEO and ModelFeature.VIDEO in model.entity.features)
-                            or (item.type == PromptMessageContentType.DOCUMENT and ModelFeature.DOCUMENT in model.entity.features)
-                    )
-                ]
+                filtered_content = [item for item in msg.content if item.type in allowed_types]
+                if len(filtered_content) == len(msg.content):
+                    # nothing was dropped, keep the original message
+                    yield msg
+                    continue
                 new_msg = msg.__class__(
                     role=msg.role,
                     content=filtered_content,
@@ -0,0 +1,49 @@
+import random
+
+from utils.mcp_client import _iter_sse_events
+
+STREAM = (
+    b'event: endpoint\r\ndata: /messages?session_id=1\r\n\r\n'
+    b': ping\n\n'
+    b'data: {"id":1}\ndata: {"b":2}\n\n'
+    b'event:message\rdata:x\r\r'
+    b'data: 1\r\n\r\ndata: 2\n\n'
+)
+EVENTS = [
+    ("endpoint", b"/messages?session_id=1"),
+    ("message", b'{"id":1}\n{"b":2}'),
+    ("message", b"x"),
+    ("message", b"1"),
+    ("message", b"2"),
+]
+
+
+def test_single_chunk():
+    assert list(_iter_sse_events([STREAM])) == EVENTS
+
+
+def test_every_two_point_split():
+    for i in range(len(STREAM) + 1):
+        for j in range(i, len(STREAM) + 1):
+            chunks = [STREAM[:i], STREAM[i:j], STREAM[j:]]
+            assert list(_iter_sse_events(chunks)) == EVENTS, (i, j)
+
+
+def test_random_chunk_boundaries():
+    rng = random.Random(0)
+    for _ in range(2000):
+        cuts = sorted(rng.sample(range(len(STREAM) + 1), rng.randint(1, 12)))
+        chunks = [STREAM[a:b] for a, b in zip([0] + cuts, cuts + [len(STREAM)])]
+        assert list(_iter_sse_events(chunks)) == EVENTS, cuts
+
+
+def test_crlf_split_before_blank_line():
+    chunks = [b"data: 1\r", b"\n", b"\ndata: 2\n\n"]
+    assert list(_iter_sse_events(chunks)) == [("message", b"1"), ("message", b"2")]
+
+
+def test_line_spanning_many_chunks():
+    data = b"A" * 100_000
+    stream = b"data: " + data + b"\n\n"
+    chunks = [stream[i:i + 4096] for i in range(0, len(stream), 4096)]
+    assert list(_iter_sse_events(chunks)) == [("message", data)]
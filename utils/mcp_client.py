@@ -1,24 +1,103 @@
 import logging
 import re
+import time
 import uuid
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor, as_completed, Executor, Future, wait
 from enum import Enum
-from itertools import chain
+from importlib.util import find_spec
+from itertools import chain, count
 from threading import Event, Thread, Lock
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator
 from urllib.parse import urljoin, urlparse
 
 import httpx
 import orjson
 from dify_plugin.config.logger_format import plugin_logger_handler
-from httpx_sse import connect_sse, EventSource
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 logger.addHandler(plugin_logger_handler)
 
+# HTTP/2 needs the optional 'h2' package, fall back to HTTP/1.1 without it
+_HTTP2_ENABLED = find_spec("h2") is not None
+
+# static JSON-RPC payloads and headers, never mutated
+_INITIALIZED_NOTIFICATION = {
+    "jsonrpc": "2.0",
+    "method": "notifications/initialized",
+    "params": {}
+}
+_SSE_STREAM_HEADERS = {"Accept": "text/event-stream", "Cache-Control": "no-store"}
+_JSON_CONTENT_TYPE_HEADERS = {"Content-Type": "application/json"}
+
+
+def _iter_sse_events(chunks: Iterable[bytes]) -> Iterator[tuple[str, bytes]]:
+    """
+    Parse a Server-Sent Events byte stream into (event, data) pairs.
+    Only the new chunk is scanned for line breaks, pieces of a line spanning
+    several chunks are kept in a list and joined once the line is complete.
+    :param chunks: raw byte chunks of the stream
+    :return: iterator of event type and data bytes
+    """
+    event = "message"
+    data_lines: list[bytes] = []
+    line_pieces: list[bytes] = []
+    skip_lf = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if skip_lf and chunk.startswith(b"\n"):
+            # CRLF split across two chunks
+            chunk = chunk[1:]
+        skip_lf = chunk.endswith(b"\r")
+        if not chunk:
+            continue
+        lines = []
+        for piece in chunk.splitlines(keepends=True):
+            if not piece.endswith((b"\n", b"\r")):
+                # only the last piece of a chunk can be unfinished
+                line_pieces.append(piece)
+            elif line_pieces:
+                line_pieces.append(piece)
+                lines.append(b"".join(line_pieces))
+                line_pieces.clear()
+            else:
+                lines.append(piece)
+        for line in lines:
+            line = line.rstrip(b"\r\n")
+            if not line:
+                if data_lines:
+                    yield event, b"\n".join(data_lines)
+                    data_lines.clear()
+                event = "message"
+                continue
+            if line.startswith(b":"):
+                continue
+            field, _, value = line.partition(b":")
+            if value.startswith(b" "):
+                value = value[1:]
+            if field == b"data":
+                data_lines.append(value)
+            elif field == b"event":
+                event = value.decode()
+
+
+def _share_connection_pool(client: httpx.Client) -> httpx.Client:
+    """
+    Create a client with its own cookie jar on top of the connection pool of another client.
+    The transport and the proxy mounts (taken from the environment by the pool owner) are reused,
+    cookies set by one MCP server are never sent to another one on the same host.
+    Only the pool owner closes the shared transports.
+    :param client: client owning the connection pool
+    :return: client sharing the connection pool
+    """
+    return httpx.Client(
+        transport=client._transport,
+        mounts={pattern.pattern: transport for pattern, transport in client._mounts.items()},
+    )
+
 
 class McpClient(ABC):
     """Interface for MCP client."""
@@ -26,16 +105,34 @@ class McpClient(ABC):
     def __init__(self, name: str, url: str,
                  headers: dict[str, Any] | None = None,
                  timeout: float = 50,
+                 client: httpx.Client | None = None,
                  ):
         self.name = name
         self.url = url
-        self.headers = headers
+        self.headers = headers or {}
         self.timeout = timeout
-        self.id_counter = 0
-
-    def _get_next_id(self):
-        self.id_counter += 1
-        return self.id_counter
+        # a client passed in is shared with other MCP clients and closed by its owner
+        self._owns_client = client is None
+        if client is None:
+            self.client = httpx.Client(http2=_HTTP2_ENABLED)
+        else:
+            self.client = _share_connection_pool(client)
+        # itertools.count is atomic under the GIL, fetch_tools issues requests from several threads
+        self._id_counter = count(1)
+
+    def _get_next_id(self) -> int:
+        return next(self._id_counter)
+
+    def _build_headers(self, *overrides: dict[str, str]) -> httpx.Headers:
+        # httpx.Headers merges case-insensitively, a configured 'accept' is overridden, not duplicated
+        headers = httpx.Headers(self.headers)
+        for override in overrides:
+            headers.update(override)
+        return headers
+
+    def _close_client(self) -> None:
+        if self._owns_client:
+            self.client.close()
 
     @abstractmethod
     def close(self) -> None:
@@ -65,7 +162,7 @@ class McpClient(ABC):
                 return []
             raise Exception(f"{self.name} - MCP Server tools/list error: {error}")
         tools = response.get("result", {}).get("tools", [])
-        logger.info(f"{self.name} - MCP Server tools/list: {tools}")
+        logger.info("%s - MCP Server tools/list: %s", self.name, tools)
         return tools
 
     def call_tool(self, name: str, arguments: dict) -> list[dict]:
@@ -83,7 +180,7 @@ class McpClient(ABC):
             error = response["error"]
             raise Exception(f"{self.name} - MCP Server tools/call error: {error}")
         content = response.get("result", {}).get("content", [])
-        logger.info(f"{self.name} - MCP Server tools/call: {content}")
+        logger.info("%s - MCP Server tools/call: %s", self.name, content)
         return content
 
     def list_resources(self) -> list[dict]:
@@ -102,7 +199,7 @@ class McpClient(ABC):
                 return []
             raise Exception(f"{self.name} - MCP Server resources/list error: {error}")
         resources = response.get("result", {}).get("resources", [])
-        logger.info(f"{self.name} - MCP Server resources/list: {resources}")
+        logger.info("%s - MCP Server resources/list: %s", self.name, resources)
         return resources
 
     def read_resource(self, uri: str) -> list[dict]:
@@ -119,7 +216,7 @@ class McpClient(ABC):
             error = response["error"]
             raise Exception(f"{self.name} - MCP Server resources/read error: {error}")
         contents = response.get("result", {}).get("contents", [])
-        logger.info(f"{self.name} - MCP Server resources/read: {contents}")
+        logger.info("%s - MCP Server resources/read: %s", self.name, contents)
         return contents
 
     def list_resources_templates(self) -> list[dict]:
@@ -137,7 +234,7 @@ class McpClient(ABC):
                 return []
             raise Exception(f"{self.name} - MCP Server resources/templates/list error: {error}")
         resources = response.get("result", {}).get("resourceTemplates", [])
-        logger.info(f"{self.name} - MCP Server resources/templates/list: {resources}")
+        logger.info("%s - MCP Server resources/templates/list: %s", self.name, resources)
         return resources
 
     def list_prompts(self) -> list[dict]:
@@ -156,7 +253,7 @@ class McpClient(ABC):
                 return []
             raise Exception(f"{self.name} - MCP Server prompts/list error: {error}")
         prompts = response.get("result", {}).get("prompts", [])
-        logger.info(f"{self.name} - MCP Server prompts/list: {prompts}")
+        logger.info("%s - MCP Server prompts/list: %s", self.name, prompts)
         return prompts
 
     def get_prompt(self, name: str, arguments: dict) -> list[dict]:
@@ -174,7 +271,7 @@ class McpClient(ABC):
             error = response["error"]
             raise Exception(f"{self.name} - MCP Server prompts/get error: {error}")
         messages = response.get("result", {}).get("messages", [])
-        logger.info(f"{self.name} - MCP Server prompts/get: {messages}")
+        logger.info("%s - MCP Server prompts/get: %s", self.name, messages)
         return messages
 
 
@@ -187,18 +284,23 @@ class McpSseClient(McpClient):
                  headers: dict[str, Any] | None = None,
                  timeout: float = 50,
                  sse_read_timeout: float = 50,
+                 client: httpx.Client | None = None,
                  ):
-        super().__init__(name, url, headers, timeout)
+        super().__init__(name, url, headers, timeout, client)
         self.sse_read_timeout = sse_read_timeout
         self.endpoint_url = None
-        self.client = httpx.Client(headers=headers, timeout=httpx.Timeout(timeout, read=sse_read_timeout))
-        self.message_dict = {}
-        self.response_ready = Event()
+        self._stream_response: httpx.Response | None = None
+        self._stream_headers = self._build_headers(_SSE_STREAM_HEADERS)
+        self._post_headers = self._build_headers(_JSON_CONTENT_TYPE_HEADERS)
+        self._pending: dict[Any, Future] = {}
+        self._pending_lock = Lock()
         self.should_stop = Event()
         self._listen_thread = None
         self._connected = Event()
         self._error_event = Event()
+        self._closed = Event()
         self._thread_exception = None
+        self._last_activity = time.monotonic()
         self.connect()
 
     @staticmethod
@@ -207,96 +309,159 @@ class McpSseClient(McpClient):
 
     def _listen_messages(self) -> None:
         try:
-            logger.info(f"{self.name} - Connecting to SSE endpoint: {self.remove_request_params(self.url)}")
-            with connect_sse(
-                    client=self.client,
+            logger.info("%s - Connecting to SSE endpoint: %s", self.name, self.remove_request_params(self.url))
+            with self.client.stream(
                     method="GET",
                     url=self.url,
+                    headers=self._stream_headers,
                     timeout=httpx.Timeout(self.timeout, read=self.sse_read_timeout),
                     follow_redirects=True,
-            ) as event_source:
-                event_source.response.raise_for_status()
-                logger.debug(f"{self.name} - SSE connection established")
-                for sse in event_source.iter_sse():
-                    logger.debug(f"{self.name} - Received SSE event: {sse.event}")
+            ) as response:
+                self._stream_response = response
+                response.raise_for_status()
+                content_type = response.headers.get("content-type", "None")
+                if "text/event-stream" not in content_type:
+                    raise ValueError(f"{self.name} - Unsupported SSE Content-Type: {content_type}")
+                logger.debug("%s - SSE connection established", self.name)
+                for event, data in _iter_sse_events(self._iter_stream_chunks(response)):
+                    logger.debug("%s - Received SSE event: %s", self.name, event)
                     if self.should_stop.is_set():
                         break
-                    match sse.event:
-                        case "endpoint":
-                            self.endpoint_url = urljoin(self.url, sse.data)
-                            logger.info(f"{self.name} - Received endpoint URL: {self.endpoint_url}")
-                            self._connected.set()
-                            url_parsed = urlparse(self.url)
-                            endpoint_parsed = urlparse(self.endpoint_url)
-                            if (url_parsed.netloc != endpoint_parsed.netloc
-                                    or url_parsed.scheme != endpoint_parsed.scheme):
-                                error_msg = f"{self.name} - Endpoint origin does not match connection origin: {self.endpoint_url}"
-                                logger.error(error_msg)
-                                raise ValueError(error_msg)
-                        case "message":
-                            message = orjson.loads(sse.data)
-                            logger.debug(f"{self.name} - Received server message: {message}")
-                            self.message_dict[message["id"]] = message
-                            self.response_ready.set()
-                        case _:
-                            logger.warning(f"{self.name} - Unknown SSE event: {sse.event}")
+                    # responses are by far the most frequent event, check them first
+                    if event == "message":
+                        self._dispatch_message(orjson.loads(data))
+                    elif event == "endpoint":
+                        self.endpoint_url = urljoin(self.url, data.decode())
+                        logger.info("%s - Received endpoint URL: %s", self.name, self.endpoint_url)
+                        url_parsed = urlparse(self.url)
+                        endpoint_parsed = urlparse(self.endpoint_url)
+                        if (url_parsed.netloc != endpoint_parsed.netloc
+                                or url_parsed.scheme != endpoint_parsed.scheme):
+                            error_msg = f"{self.name} - Endpoint origin does not match connection origin: {self.endpoint_url}"
+                            logger.error(error_msg)
+                            raise ValueError(error_msg)
+                        self._connected.set()
+                    else:
+                        logger.warning("%s - Unknown SSE event: %s", self.name, event)
         except Exception as e:
             self._thread_exception = e
             self._error_event.set()
+        finally:
+            self._fail_pending()
+            # wake connect() whether the endpoint arrived or the listener stopped
             self._connected.set()
 
+    def _dispatch_message(self, message: dict) -> None:
+        """
+        Hand a server message to the request waiting for it, the listener never blocks on a consumer
+        :param message: JSON-RPC message received on the SSE stream
+        """
+        logger.debug("%s - Received server message: %s", self.name, message)
+        if "method" in message:
+            # server requests (e.g. ping) and notifications are not responses to our requests,
+            # their ids are chosen by the server and may collide with ours
+            logger.debug("%s - Ignored server %s: %s", self.name,
+                         "request" if "id" in message else "notification", message["method"])
+            return
+        with self._pending_lock:
+            future = self._pending.pop(message.get("id"), None)
+        if future is None:
+            logger.warning("%s - Dropped response without pending request: %s", self.name, message.get("id"))
+            return
+        future.set_result(message)
+
+    def _iter_stream_chunks(self, response: httpx.Response) -> Iterator[bytes]:
+        # any bytes, including ':' keep-alive comments, count as stream activity
+        for chunk in response.iter_bytes():
+            self._last_activity = time.monotonic()
+            yield chunk
+
+    def _discard_pending(self, message_id: Any) -> None:
+        with self._pending_lock:
+            self._pending.pop(message_id, None)
+
+    def _fail_pending(self) -> None:
+        error = ConnectionError(f"{self.name} - MCP Server SSE connection closed: {self._thread_exception}")
+        with self._pending_lock:
+            self._closed.set()
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            future.set_exception(error)
+
     def send_message(self, data: dict) -> dict:
         if not self.endpoint_url:
             if self._thread_exception:
                 raise ConnectionError(f"{self.name} - MCP Server connection failed: {self._thread_exception}")
             else:
                 raise RuntimeError(f"{self.name} - Please call connect() first")
-        logger.debug(f"{self.name} - Sending client message: {data}")
-        response = self.client.post(
-            url=self.endpoint_url,
-            json=data,
-            headers={"Content-Type": "application/json"},
-            timeout=httpx.Timeout(self.timeout),
-            follow_redirects=True,
-        )
-        response.raise_for_status()
-        logger.info(f"response status: {response.status_code} {response.reason_phrase}")
-        if not response.is_success:
-            raise ValueError(
-                f"{self.name} - MCP Server response: {response.status_code} {response.reason_phrase} ({response.content})")
+        logger.debug("%s - Sending client message: %s", self.name, data)
+        future = None
         if "id" in data:
-            message_id = data["id"]
-            while True:
-                self.response_ready.wait()
-                self.response_ready.clear()
-                if message_id in self.message_dict:
-                    logger.info(f"message_id: {message_id}")
-                    message = self.message_dict.pop(message_id, None)
-                    logger.info(f"message: {message}")
-                    if message and message.get("method") == "ping":
-                        continue
-                    return message
-        return {}
+            # register before posting, the response may arrive on the SSE stream before the POST returns
+            future = Future()
+            with self._pending_lock:
+                if self._closed.is_set():
+                    raise ConnectionError(
+                        f"{self.name} - MCP Server SSE connection closed: {self._thread_exception}")
+                self._pending[data["id"]] = future
+        try:
+            response = self.client.post(
+                url=self.endpoint_url,
+                content=orjson.dumps(data),
+                headers=self._post_headers,
+                timeout=httpx.Timeout(self.timeout),
+                follow_redirects=True,
+            )
+            response.raise_for_status()
+            logger.info("response status: %s %s", response.status_code, response.reason_phrase)
+            if not response.is_success:
+                raise ValueError(
+                    f"{self.name} - MCP Server response: {response.status_code} {response.reason_phrase} ({response.content})")
+        except Exception:
+            if future is not None:
+                self._discard_pending(data["id"])
+            raise
+        if future is None:
+            return {}
+        sent_at = time.monotonic()
+        # keep-alive pings extend the wait, but a response that never arrives must still time out
+        max_deadline = sent_at + self.timeout + self.sse_read_timeout
+        while True:
+            # time out once the stream has been idle for sse_read_timeout or the absolute cap is reached
+            deadline = min(max(self._last_activity, sent_at) + self.sse_read_timeout, max_deadline)
+            try:
+                message = future.result(timeout=max(deadline - time.monotonic(), 0))
+                break
+            except TimeoutError:
+                now = time.monotonic()
+                if now >= max_deadline or max(self._last_activity, sent_at) + self.sse_read_timeout <= now:
+                    self._discard_pending(data["id"])
+                    raise TimeoutError(
+                        f"{self.name} - MCP Server response timed out after {now - sent_at:.0f}s: "
+                        f"{data.get('method')}") from None
+        logger.info("message: %s", message)
+        return message
 
     def connect(self) -> None:
         self._listen_thread = Thread(target=self._listen_messages, daemon=True)
         self._listen_thread.start()
-        while True:
-            if self._error_event.is_set():
-                if isinstance(self._thread_exception, httpx.HTTPStatusError):
-                    raise ConnectionError(f"{self.name} - MCP Server connection failed: {self._thread_exception}") \
-                        from self._thread_exception
-                else:
-                    raise self._thread_exception
-            if self._connected.wait(timeout=0.1):
-                break
-            if not self._listen_thread.is_alive():
-                raise ConnectionError(f"{self.name} - MCP Server SSE listener thread died unexpectedly!")
+        self._connected.wait()
+        if self._error_event.is_set():
+            if isinstance(self._thread_exception, httpx.HTTPStatusError):
+                raise ConnectionError(f"{self.name} - MCP Server connection failed: {self._thread_exception}") \
+                    from self._thread_exception
+            else:
+                raise self._thread_exception
+        if not self.endpoint_url:
+            raise ConnectionError(f"{self.name} - MCP Server SSE stream closed before sending the endpoint event")
 
     def close(self) -> None:
         try:
             self.should_stop.set()
-            self.client.close()
+            if self._stream_response is not None:
+                self._stream_response.close()
+            self._close_client()
             if self._listen_thread and self._listen_thread.is_alive():
                 self._listen_thread.join(timeout=10)
         except Exception as e:
@@ -305,7 +470,7 @@ class McpSseClient(McpClient):
     def initialize(self):
         init_data = {
             "jsonrpc": "2.0",
-            "id": uuid.uuid4().hex,
+            "id": self._get_next_id(),
             "method": "initialize",
             "params": {
                 "protocolVersion": "2024-11-05",
@@ -319,12 +484,7 @@ class McpSseClient(McpClient):
         response = self.send_message(init_data)
         if "error" in response:
             raise Exception(f"MCP Server initialize error: {response['error']}")
-        notify_data = {
-            "jsonrpc": "2.0",
-            "method": "notifications/initialized",
-            "params": {}
-        }
-        response = self.send_message(notify_data)
+        response = self.send_message(_INITIALIZED_NOTIFICATION)
         if "error" in response:
             raise Exception(f"MCP Server notifications/initialized error: {response['error']}")
 
@@ -337,53 +497,76 @@ class McpStreamableHttpClient(McpClient):
     def __init__(self, name: str, url: str,
                  headers: dict[str, Any] | None = None,
                  timeout: float = 50,
+                 client: httpx.Client | None = None,
                  ):
-        super().__init__(name, url, headers, timeout)
-        self.client = httpx.Client(headers=headers, timeout=httpx.Timeout(timeout))
+        super().__init__(name, url, headers, timeout, client)
         self.session_id = None
+        self._post_headers = self._build_headers(
+            _JSON_CONTENT_TYPE_HEADERS,
+            {"Accept": "application/json, text/event-stream"},
+        )
 
     def close(self) -> None:
         try:
-            self.client.close()
+            self._close_client()
         except Exception as e:
             raise Exception(f"{self.name} - MCP Server connection close failed: {str(e)}")
 
     def send_message(self, data: dict) -> dict:
-        headers = {"Content-Type": "application/json", "Accept": "application/json, text/event-stream"}
-        if self.session_id:
-            headers["Mcp-Session-Id"] = self.session_id
-        logger.debug(f"{self.name} - Sending client message: {data}")
-        response = self.client.post(
-            url=self.url,
-            json=data,
-            headers=headers,
-            timeout=httpx.Timeout(self.timeout),
-            follow_redirects=True,
-        )
-        logger.info(f"response status: {response.status_code} {response.reason_phrase}")
-        if not response.is_success:
-            raise ValueError(
-                f"{self.name} - MCP Server response: {response.status_code} {response.reason_phrase} ({response.content})")
-        logger.info(f"response headers: {response.headers}")
-        if "mcp-session-id" in response.headers:
-            self.session_id = response.headers.get("mcp-session-id")
-        logger.info(f"response content: {response.content}")
-        if not response.content:
-            return {}
-        message = {}
-        content_type = response.headers.get("content-type", "None")
-        if "text/event-stream" in content_type:
-            for sse in EventSource(response).iter_sse():
-                if sse.event == "ping":
-                    continue
-                if sse.event != "message":
-                    raise Exception(f"{self.name} - Unknown Server-Sent Event: {sse.event}")
-                message = orjson.loads(sse.data)
-        elif "application/json" in content_type:
-            message = (response.json() if response.content else None) or {}
-        else:
-            raise Exception(f"{self.name} - Unsupported Content-Type: {content_type}")
-        logger.info(f"message: {message}")
+        logger.debug("%s - Sending client message: %s", self.name, data)
+        with self.client.stream(
+                method="POST",
+                url=self.url,
+                content=orjson.dumps(data),
+                headers=self._post_headers,
+                timeout=httpx.Timeout(self.timeout),
+                follow_redirects=True,
+        ) as response:
+            logger.info("response status: %s %s", response.status_code, response.reason_phrase)
+            if not response.is_success:
+                response.read()
+                raise ValueError(
+                    f"{self.name} - MCP Server response: {response.status_code} {response.reason_phrase} ({response.content})")
+            logger.info("response headers: %s", response.headers)
+            session_id = response.headers.get("mcp-session-id")
+            if session_id and session_id != self.session_id:
+                self.session_id = session_id
+                # replace rather than mutate, the current headers may be in use by a concurrent request
+                post_headers = self._post_headers.copy()
+                post_headers["Mcp-Session-Id"] = session_id
+                self._post_headers = post_headers
+            message = {}
+            content_type = response.headers.get("content-type", "None")
+            if "text/event-stream" in content_type:
+                for event, event_data in _iter_sse_events(response.iter_bytes()):
+                    if event == "ping":
+                        continue
+                    if event != "message":
+                        raise Exception(f"{self.name} - Unknown Server-Sent Event: {event}")
+                    server_message = orjson.loads(event_data)
+                    logger.debug("%s - Received server message: %s", self.name, server_message)
+                    # server requests and notifications (e.g. progress) may precede the response,
+                    # their ids are chosen by the server and may collide with ours
+                    if "method" in server_message:
+                        continue
+                    if "id" in data and server_message.get("id") == data["id"]:
+                        message = server_message
+                        break
+                else:
+                    if "id" in data:
+                        raise Exception(
+                            f"{self.name} - MCP Server SSE response ended without a response to request "
+                            f"{data['id']!r}")
+            else:
+                response.read()
+                logger.info("response content: %s", response.content)
+                if not response.content:
+                    return {}
+                if "application/json" in content_type:
+                    message = orjson.loads(response.content) or {}
+                else:
+                    raise Exception(f"{self.name} - Unsupported Content-Type: {content_type}")
+        logger.info("message: %s", message)
         return message
 
     def initialize(self):
@@ -403,12 +586,7 @@ class McpStreamableHttpClient(McpClient):
         response = self.send_message(init_data)
         if "error" in response:
             raise Exception(f"MCP Server initialize error: {response['error']}")
-        notify_data = {
-            "jsonrpc": "2.0",
-            "method": "notifications/initialized",
-            "params": {}
-        }
-        response = self.send_message(notify_data)
+        response = self.send_message(_INITIALIZED_NOTIFICATION)
         if "error" in response:
             raise Exception(f"MCP Server notifications/initialized error: {response['error']}")
 
@@ -433,22 +611,46 @@ class McpClients:
                  prompts_as_tools: bool = False):
         if "mcpServers" in servers_config:
             servers_config = servers_config["mcpServers"]
-        self._clients = {
-            name: self.init_client(name, config)
-            for name, config in servers_config.items()
-        }
+        self._clients: dict[str, McpClient] = {}
+        # one connection pool for all servers, each MCP client keeps its own cookie jar on top of it,
+        # timeouts and headers are set per request
+        self._http_client = httpx.Client(http2=_HTTP2_ENABLED)
         self._tool_actions_lock = Lock()
+        # connect and initialize all servers concurrently, startup takes the slowest handshake instead of the sum
         with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(client.initialize) for client in self._clients.values()]
-            wait(futures)
-            for f in futures:
-                f.result()
+            futures = {
+                name: executor.submit(self.start_client, name, config, self._http_client)
+                for name, config in servers_config.items()
+            }
+            wait(futures.values())
+        error = None
+        for name, future in futures.items():
+            if future.exception() is None:
+                self._clients[name] = future.result()
+            elif error is None:
+                error = future.exception()
+        if error is not None:
+            self.close()
+            raise error
         self._resources_as_tools = resources_as_tools
         self._prompts_as_tools = prompts_as_tools
         self._tool_actions: dict[str, ToolAction] = {}
+        self._tools: list[dict] | None = None
+
+    @classmethod
+    def start_client(cls, name: str, config: dict[str, Any],
+                     http_client: httpx.Client | None = None) -> McpClient:
+        client = cls.init_client(name, config, http_client)
+        try:
+            client.initialize()
+        except Exception:
+            client.close()
+            raise
+        return client
 
     @staticmethod
-    def init_client(name: str, config: dict[str, Any]) -> McpClient:
+    def init_client(name: str, config: dict[str, Any],
+                    http_client: httpx.Client | None = None) -> McpClient:
         if not re.fullmatch(r'^[a-zA-Z0-9_-]+$', name):
             raise Exception(f"Invalid server name '{name}': string does not match pattern. "
                             f"Expected a string that matches the pattern '^[a-zA-Z0-9_-]+$'.")
@@ -461,6 +663,7 @@ class McpClients:
                 url=config.get("url"),
                 headers=config.get("headers", None),
                 timeout=config.get("timeout", 50),
+                client=http_client,
             )
         return McpSseClient(
             name=name,
@@ -468,26 +671,50 @@ class McpClients:
             headers=config.get("headers", None),
             timeout=config.get("timeout", 50),
             sse_read_timeout=config.get("sse_read_timeout", 50),
+            client=http_client,
         )
 
-    def _iter_tools(self, server_name: str, client: McpClient) -> Iterator[dict]:
-        tools = client.list_tools()
-        for tool in tools:
-            name = tool["name"]
-            with self._tool_actions_lock:
-                if name in self._tool_actions:
+    def _register_tools(self, server_name: str,
+                        entries: list[tuple[dict, ActionType, dict]],
+                        tool_actions: dict[str, ToolAction]) -> list[dict]:
+        """
+        Register the tool actions of one server under a single lock acquisition
+        :param server_name: MCP server name, used as prefix for clashing tool names
+        :param entries: tool, action type and action feature of each action
+        :param tool_actions: tool actions being built by the current fetch
+        :return: the tools under their registered names
+        """
+        actions: dict[str, ToolAction] = {}
+        tools = []
+        with self._tool_actions_lock:
+            for tool, action_type, action_feature in entries:
+                name = tool["name"]
+                if name in tool_actions or name in actions:
                     name = f"{server_name}__{name}"
-                self._tool_actions[name] = ToolAction(
+                if (action_type in {ActionType.RESOURCE, ActionType.RESOURCE_TEMPLATE}
+                        and (name in tool_actions or name in actions)):
+                    name = f"resource__{uuid.uuid4().hex}"
+                actions[name] = ToolAction(
                     tool_name=name,
                     server_name=server_name,
-                    action_type=ActionType.TOOL,
-                    action_feature=tool,
+                    action_type=action_type,
+                    action_feature=action_feature,
                 )
-            yield tool
+                tools.append(tool if name == tool["name"] else {**tool, "name": name})
+            # a single update resizes the dict once for the whole batch
+            tool_actions.update(actions)
+        return tools
 
-    def _iter_resources(self, server_name: str, client: McpClient) -> Iterator[dict]:
+    def _list_tools(self, server_name: str, client: McpClient,
+                    tool_actions: dict[str, ToolAction]) -> list[dict]:
+        tools = client.list_tools()
+        return self._register_tools(server_name, [(tool, ActionType.TOOL, tool) for tool in tools], tool_actions)
+
+    def _list_resources(self, server_name: str, client: McpClient,
+                        tool_actions: dict[str, ToolAction]) -> list[dict]:
         resources = client.list_resources()
         resources_templates = client.list_resources_templates()
+        entries = []
         for resource in resources + resources_templates:
             resource_name = resource["name"]
             name = (re.sub(r'[^a-zA-Z0-9 _-]', '', resource_name)
@@ -526,17 +753,6 @@ class McpClients:
                 required = ["uri"]
             else:
                 raise Exception(f"Unsupported resource: {resource}")
-            with self._tool_actions_lock:
-                if name in self._tool_actions:
-                    name = f"{server_name}__{name}"
-                if name in self._tool_actions:
-                    name = f"resource__{uuid.uuid4().hex}"
-                self._tool_actions[name] = ToolAction(
-                    tool_name=name,
-                    server_name=server_name,
-                    action_type=action_type,
-                    action_feature=resource,
-                )
             tool = {
                 "name": name,
                 "description": description,
@@ -546,22 +762,16 @@ class McpClients:
                     "required": required
                 }
             }
-            yield tool
+            entries.append((tool, action_type, resource))
+        return self._register_tools(server_name, entries, tool_actions)
 
-    def _iter_prompts(self, server_name: str, client: McpClient) -> Iterator[dict]:
+    def _list_prompts(self, server_name: str, client: McpClient,
+                      tool_actions: dict[str, ToolAction]) -> list[dict]:
         prompts = client.list_prompts()
+        entries = []
         for prompt in prompts:
             prompt_name = prompt["name"]
             name = f"prompt__{prompt_name}"
-            with self._tool_actions_lock:
-                if name in self._tool_actions:
-                    name = f"{server_name}__{name}"
-                self._tool_actions[name] = ToolAction(
-                    tool_name=name,
-                    server_name=server_name,
-                    action_type=ActionType.PROMPT,
-                    action_feature=prompt,
-                )
             prompt_description = prompt.get("description", "")
             description = (
                     f"Use the prompt template '{prompt_name}' from MCP Server."
@@ -588,37 +798,53 @@ class McpClients:
                     "required": required
                 }
             }
-            yield tool
+            entries.append((tool, ActionType.PROMPT, prompt))
+        return self._register_tools(server_name, entries, tool_actions)
 
-    def _iter_all_tools_futures(self, server_name: str, client: McpClient, executor: Executor) -> Iterator[Future]:
-        yield executor.submit(lambda: list(self._iter_tools(server_name, client)))
+    def _iter_all_tools_futures(self, server_name: str, client: McpClient, executor: Executor,
+                                tool_actions: dict[str, ToolAction]) -> Iterator[Future]:
+        yield executor.submit(self._list_tools, server_name, client, tool_actions)
         if self._resources_as_tools:
-            yield executor.submit(lambda: list(self._iter_resources(server_name, client)))
+            yield executor.submit(self._list_resources, server_name, client, tool_actions)
         if self._prompts_as_tools:
-            yield executor.submit(lambda: list(self._iter_prompts(server_name, client)))
-
-    def fetch_tools(self) -> list[dict]:
+            yield executor.submit(self._list_prompts, server_name, client, tool_actions)
+
+    def fetch_tools(self, refresh: bool = False) -> list[dict]:
+        """
+        Fetch the tools of all MCP servers, the result is cached until refreshed
+        :param refresh: query the MCP servers again instead of returning the cached tools
+        :return: tools
+        """
+        if self._tools is not None and not refresh:
+            return list(self._tools)
+        # names are resolved from scratch into a new map, the current tools stay usable if the fetch fails
+        tool_actions: dict[str, ToolAction] = {}
         try:
             with ThreadPoolExecutor(max_workers=10) as executor:
                 futures = tuple(chain.from_iterable((
-                    self._iter_all_tools_futures(server_name=server_name, client=client, executor=executor)
+                    self._iter_all_tools_futures(server_name=server_name, client=client, executor=executor,
+                                                 tool_actions=tool_actions)
                     for server_name, client in self._clients.items()
                 )))
                 all_tools = list(chain.from_iterable(future.result() for future in as_completed(futures)))
 
-                logger.info(f"Fetching tools: {all_tools}")
-                return all_tools
+                logger.info("Fetching tools: %s", all_tools)
+                with self._tool_actions_lock:
+                    self._tool_actions = tool_actions
+                    self._tools = all_tools
+                return list(all_tools)
         except Exception as e:
             raise Exception(f"Error fetching tools: {str(e)}")
 
     def execute_tool(self, tool_name: str, tool_args: dict[str, Any]) -> list[dict]:
-        if not self._tool_actions:
+        if self._tools is None:
             self.fetch_tools()
         if tool_name not in self._tool_actions:
             raise Exception(f"There is not a tool named {tool_name!r}")
         tool_action = self._tool_actions[tool_name]
         server_name = tool_action.server_name
-        logger.info(f"Executing tool! server name: {server_name}, tool name: {tool_name}, tool arguments: {tool_args}")
+        logger.info("Executing tool! server name: %s, tool name: %s, tool arguments: %s",
+                    server_name, tool_name, tool_args)
         if server_name not in self._clients:
             raise Exception(f"There is not a MCP Server named {server_name!r}")
         client = self._clients[server_name]
@@ -626,7 +852,8 @@ class McpClients:
         try:
             tool_contents = []
             if action_type == ActionType.TOOL:
-                tool_contents = client.call_tool(tool_name, tool_args)
+                tool = tool_action.action_feature
+                tool_contents = client.call_tool(tool["name"], tool_args)
             elif action_type in [ActionType.RESOURCE, ActionType.RESOURCE_TEMPLATE]:
                 if action_type == ActionType.RESOURCE:
                     resource = tool_action.action_feature
@@ -670,7 +897,7 @@ class McpClients:
                 })
             else:
                 raise Exception(f"Unsupported Action type: {action_type}")
-            logger.info(f"Executing tool: {tool_contents}")
+            logger.info("Executing tool: %s", tool_contents)
             return tool_contents
         except Exception as e:
             raise Exception(f"Error executing tool: {str(e)}")
@@ -681,3 +908,4 @@ class McpClients:
                 client.close()
             except Exception as e:
                 logger.error(e)
+        self._http_client.close()